@@ -15,21 +15,86 @@ Key Takeaways:
 - Async is best for I/O-bound tasks with many concurrent operations
 """
 
+import os
+import sys
+import math
 import time
+import tempfile
+import socket
+import selectors
 import threading
 import asyncio
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Optional: uvloop (libuv-based event loop) - not available on Windows
+uvloop = None
+if sys.platform != "win32":
+    try:
+        import uvloop
+    except ImportError:
+        pass
+
+# Optional: NumPy (adds a vectorized run to the CPU-bound demo)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: aiofiles (async file API, backed by a thread pool)
+try:
+    import aiofiles
+except ImportError:
+    aiofiles = None
+
+
+def _log(message, events=None):
+    """Print now, or collect into `events` to print after the timed region"""
+    if events is None:
+        print(message)
+    else:
+        events.append(message)
 
 
 # ============================================================================
 # PART 1: CPU-Bound Task - GIL BLOCKS parallel execution
 # ============================================================================
 
-def cpu_bound_task(n):
-    """Simulates CPU-intensive work (GIL stays locked)"""
+# NumPy works in int64: results are exact while every square (n-1)**2 fits,
+# i.e. for n <= _NUMPY_MAX_N (about 3 billion). Larger n uses the Python loop.
+_INT64_MAX = 2**63 - 1
+_NUMPY_MAX_N = math.isqrt(_INT64_MAX) + 1
+
+
+def _sum_of_squares_numpy(n):
+    """Vectorized sum of squares - one C loop instead of n bytecode dispatches"""
+    if n <= 0:
+        return 0
+    values = np.arange(n, dtype=np.int64)
+    squares = values * values
+    # A chunk sums to at most chunk * (n-1)**2, so size chunks to stay within int64
+    chunk = _INT64_MAX // max(1, (n - 1) ** 2)
+    partial_sums = np.add.reduceat(squares, np.arange(0, n, chunk))
+    return sum(partial_sums.tolist())
+
+
+def sum_of_squares_closed_form(n):
+    """Same result as cpu_bound_task(n) with no loop: 0² + 1² + ... + (n-1)²"""
+    return (n - 1) * n * (2 * n - 1) // 6
+
+
+def cpu_bound_task(n, use_numpy=False):
+    """Simulates CPU-intensive work (GIL stays locked)
+    
+    The pure-Python loop is the bytecode-bound reference used by the GIL demo.
+    With use_numpy=True the work runs in NumPy's C code instead
+    (up to n = _NUMPY_MAX_N).
+    """
+    if use_numpy and np is not None and n <= _NUMPY_MAX_N:
+        return _sum_of_squares_numpy(n)
     count = 0
     for i in range(n):
-        count += i ** 2
+        count += i * i
     return count
 
 
@@ -42,64 +107,122 @@ def demo_cpu_bound_with_gil():
     iterations = 10_000_000
     
     # Single-threaded execution
-    start = time.perf_counter()
+    start = time.perf_counter_ns()
     cpu_bound_task(iterations)
     cpu_bound_task(iterations)
-    single_time = time.perf_counter() - start
+    single_time = (time.perf_counter_ns() - start) / 1e9
     print(f"Single-threaded: {single_time:.3f} seconds")
     
     # Multi-threaded execution (still serial due to GIL!)
-    start = time.perf_counter()
+    start = time.perf_counter_ns()
     with ThreadPoolExecutor(max_workers=2) as executor:
-        future1 = executor.submit(cpu_bound_task, iterations)
-        future2 = executor.submit(cpu_bound_task, iterations)
-        future1.result()
-        future2.result()
-    multi_time = time.perf_counter() - start
+        list(executor.map(cpu_bound_task, [iterations, iterations]))
+    multi_time = (time.perf_counter_ns() - start) / 1e9
     print(f"Multi-threaded:  {multi_time:.3f} seconds")
     
+    # Multi-process execution (truly parallel - each process has its own GIL)
+    start = time.perf_counter_ns()
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        list(executor.map(cpu_bound_task, [iterations, iterations]))
+    proc_time = (time.perf_counter_ns() - start) / 1e9
+    print(f"Multi-process:   {proc_time:.3f} seconds")
+    
+    # Vectorized execution (no Python bytecode in the hot loop)
+    if np is not None:
+        start = time.perf_counter_ns()
+        cpu_bound_task(iterations, use_numpy=True)
+        cpu_bound_task(iterations, use_numpy=True)
+        numpy_time = (time.perf_counter_ns() - start) / 1e9
+        print(f"NumPy (1 thread): {numpy_time:.3f} seconds")
+    
+    # Specialized execution: replace the loop with a formula (no iterations at all)
+    start = time.perf_counter_ns()
+    sum_of_squares_closed_form(iterations)
+    sum_of_squares_closed_form(iterations)
+    closed_form_time = (time.perf_counter_ns() - start) / 1e9
+    print(f"Closed form:     {closed_form_time:.6f} seconds")
+    
     print(f"\n💡 Notice: Multi-threading is NOT faster for CPU tasks!")
     print(f"   Reason: GIL allows only ONE thread to execute Python code at a time")
+    proc_speedup = multi_time / proc_time
+    if proc_speedup > 1.2:
+        print(f"   Multi-processing IS faster ({proc_speedup:.2f}x): separate processes = separate GILs")
+    else:
+        print(f"   Multi-processing gave no speedup here ({proc_speedup:.2f}x) - it needs 2+ CPU cores")
+    if np is not None:
+        print(f"   NumPy is much faster: the loop runs in C, not Python bytecode")
+    print(f"   Closed form beats them all: a better algorithm removes the loop entirely")
 
 
 # ============================================================================
 # PART 2: I/O-Bound Task - GIL RELEASES during I/O
 # ============================================================================
 
-def io_bound_task(task_id, sleep_time):
-    """Simulates I/O operation (file, network, etc.) - GIL is released"""
-    print(f"  Task {task_id} started (thread: {threading.current_thread().name})")
-    time.sleep(sleep_time)  # GIL is RELEASED during sleep/I/O!
-    print(f"  Task {task_id} completed")
+def _wait_for_io(sock, timeout):
+    """Block until `sock` is readable or the timeout expires"""
+    with selectors.DefaultSelector() as selector:
+        selector.register(sock, selectors.EVENT_READ)
+        selector.select(timeout=timeout)
+
+
+def io_bound_task(task_id, sleep_time, events=None, idle_socket=None):
+    """Simulates I/O operation (file, network, etc.) - GIL is released
+    
+    Waits on `idle_socket` via selectors if given, otherwise uses time.sleep.
+    """
+    _log(f"  Task {task_id} started (thread: {threading.current_thread().name})", events)
+    if idle_socket is not None:
+        _wait_for_io(idle_socket, sleep_time)  # GIL is RELEASED while waiting for I/O!
+    else:
+        time.sleep(sleep_time)  # GIL is RELEASED during sleep too
+    _log(f"  Task {task_id} completed", events)
     return task_id
 
 
-def demo_io_bound_with_threading():
+def demo_io_bound_with_threading(num_tasks=4):
     """Shows that multi-threading DOES help I/O-bound tasks"""
     print("\n" + "="*60)
     print("DEMO 2: I/O-Bound Task (GIL Releases During I/O)")
     print("="*60)
     
     sleep_time = 0.5
-    num_tasks = 4
+    # One thread per task so every task waits concurrently (capped to stay reasonable)
+    max_workers = min(num_tasks, 64)
     
-    # Single-threaded execution
-    print("\nSingle-threaded I/O:")
-    start = time.perf_counter()
-    for i in range(num_tasks):
-        io_bound_task(i, sleep_time)
-    single_time = time.perf_counter() - start
-    print(f"Total time: {single_time:.3f} seconds")
-    
-    # Multi-threaded execution (runs concurrently!)
-    print("\nMulti-threaded I/O:")
-    start = time.perf_counter()
-    with ThreadPoolExecutor(max_workers=4) as executor:
-        futures = [executor.submit(io_bound_task, i, sleep_time) for i in range(num_tasks)]
-        for future in futures:
-            future.result()
-    multi_time = time.perf_counter() - start
-    print(f"Total time: {multi_time:.3f} seconds")
+    # A socket that never becomes readable: waiting on it blocks in the OS I/O
+    # multiplexer (epoll on Linux, kqueue on macOS/BSD, select on Windows),
+    # the same path real network I/O takes
+    idle_socket, peer_socket = socket.socketpair()
+    with idle_socket, peer_socket:
+        # Single-threaded execution
+        # Task messages are collected and printed after timing (print is slow and takes a lock)
+        print("\nSingle-threaded I/O:")
+        events = []
+        start = time.perf_counter_ns()
+        for i in range(num_tasks):
+            io_bound_task(i, sleep_time, events, idle_socket)
+        single_time = (time.perf_counter_ns() - start) / 1e9
+        print("\n".join(events))
+        print(f"Total time: {single_time:.3f} seconds")
+        
+        # Multi-threaded execution (runs concurrently!)
+        print("\nMulti-threaded I/O:")
+        events = []
+        # Threads are cheap for I/O, but each reserves a stack (often 8MB of virtual
+        # memory). Waiting on I/O needs very little, so use small stacks for big pools.
+        old_stack_size = threading.stack_size(256 * 1024) if max_workers > 16 else None
+        try:
+            start = time.perf_counter_ns()
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                task = partial(io_bound_task, sleep_time=sleep_time, events=events,
+                               idle_socket=idle_socket)
+                list(executor.map(task, range(num_tasks)))
+            multi_time = (time.perf_counter_ns() - start) / 1e9
+        finally:
+            if old_stack_size is not None:
+                threading.stack_size(old_stack_size)
+        print("\n".join(events))
+        print(f"Total time: {multi_time:.3f} seconds")
     
     print(f"\n💡 Notice: Multi-threading IS faster for I/O tasks!")
     print(f"   Reason: GIL is RELEASED during I/O operations (sleep, network, disk)")
@@ -109,39 +232,68 @@ def demo_io_bound_with_threading():
 # PART 3: Async/Await - Cooperative Multitasking
 # ============================================================================
 
-async def async_io_task(task_id, sleep_time):
-    """Async I/O operation - cooperative multitasking"""
-    print(f"  Async task {task_id} started")
-    await asyncio.sleep(sleep_time)  # Yields control to event loop
-    print(f"  Async task {task_id} completed")
+async def async_io_task(task_id, sleep_time, loop=None, events=None):
+    """Async I/O operation - cooperative multitasking
+    
+    Pass the running loop when launching many tasks: each task then schedules
+    its wake-up directly instead of asyncio.sleep looking the loop up again.
+    """
+    _log(f"  Async task {task_id} started", events)
+    if loop is None:
+        await asyncio.sleep(sleep_time)  # Yields control to event loop
+    else:
+        future = loop.create_future()
+        handle = loop.call_later(sleep_time, future.set_result, None)
+        try:
+            await future  # Yields control to event loop
+        finally:
+            handle.cancel()
+    _log(f"  Async task {task_id} completed", events)
     return task_id
 
 
-async def demo_async_io():
+async def demo_async_io(num_tasks=4, max_concurrency=32):
     """Shows async/await for concurrent I/O operations"""
     print("\n" + "="*60)
     print("DEMO 3: Async/Await (Cooperative Multitasking)")
     print("="*60)
     
     sleep_time = 0.5
-    num_tasks = 4
+    events = []
+    loop = asyncio.get_running_loop()  # Look up once, share with every task
+    
+    # Backpressure: at most max_concurrency tasks in flight at once. Real I/O
+    # (connections, file handles, remote servers) has limits - unbounded
+    # fan-out hurts tail latency and piles up pending callbacks on the loop.
+    semaphore = asyncio.Semaphore(max_concurrency)
     
-    print("\nAsync I/O (all tasks run concurrently):")
-    start = time.perf_counter()
-    tasks = [async_io_task(i, sleep_time) for i in range(num_tasks)]
-    await asyncio.gather(*tasks)
-    async_time = time.perf_counter() - start
+    async def bounded_task(task_id):
+        async with semaphore:
+            return await async_io_task(task_id, sleep_time, loop, events)
+    
+    print(f"\nAsync I/O (tasks run concurrently, up to {max_concurrency} at a time):")
+    start = time.perf_counter_ns()
+    async with asyncio.TaskGroup() as tg:  # Python 3.11+: structured, lighter than gather
+        for i in range(num_tasks):
+            tg.create_task(bounded_task(i))
+    async_time = (time.perf_counter_ns() - start) / 1e9
+    print("\n".join(events))
     print(f"Total time: {async_time:.3f} seconds")
     
     print(f"\n💡 Notice: Async is also fast for I/O tasks!")
     print(f"   Reason: Tasks cooperatively yield control during I/O")
     print(f"   Benefit: More lightweight than threads (no thread overhead)")
+    print(f"   Event loop: {'uvloop' if uvloop is not None else 'asyncio (default)'}")
 
 
 # ============================================================================
 # PART 4: Visualizing Thread Execution
 # ============================================================================
 
+# Reused across calls so repeated runs don't pay for creating new OS threads
+_DEMO_POOL = ThreadPoolExecutor(max_workers=3, thread_name_prefix="DemoPool")
+
+
 def demonstrate_threads_are_real():
     """Proves Python uses real threads (not single-threaded!)"""
     print("\n" + "="*60)
@@ -149,23 +301,75 @@ def demonstrate_threads_are_real():
     print("="*60)
     
     def worker(name):
-        print(f"  Thread '{name}' | Thread ID: {threading.get_ident()} | Native ID: {threading.get_native_id()}")
+        ids = (name, threading.get_ident(), threading.get_native_id())
         time.sleep(0.1)
+        return ids
     
-    print("\nCreating 3 threads with different IDs:")
-    threads = []
-    for i in range(3):
-        t = threading.Thread(target=worker, args=(f"Worker-{i}",))
-        threads.append(t)
-        t.start()
-    
-    for t in threads:
-        t.join()
+    print("\nRunning 3 workers on a thread pool (each gets its own thread):")
+    for name, ident, native_id in _DEMO_POOL.map(worker, [f"Worker-{i}" for i in range(3)]):
+        print(f"  Thread '{name}' | Thread ID: {ident} | Native ID: {native_id}")
     
     print(f"\n💡 Notice: Each thread has a unique ID!")
     print(f"   Python IS multi-threaded, but GIL ensures only ONE executes at a time")
 
 
+# ============================================================================
+# PART 5: Async File I/O - Still runs on threads
+# ============================================================================
+
+def _read_file(path):
+    """Blocking file read (runs on a worker thread)"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def async_disk_task(path, loop, use_aiofiles=False):
+    """Async file read - the event loop hands the blocking read to a thread"""
+    if use_aiofiles:
+        async with aiofiles.open(path, "rb") as f:
+            data = await f.read()
+    else:
+        data = await loop.run_in_executor(None, _read_file, path)  # Default thread pool
+    return len(data)
+
+
+async def demo_async_disk_io(num_tasks=100):
+    """Shows how asyncio does file I/O: regular files go through a thread pool"""
+    print("\n" + "="*60)
+    print("DEMO 5: Async File I/O (Thread Pool Under the Hood)")
+    print("="*60)
+    
+    variants = [("run_in_executor", False)]
+    if aiofiles is not None:
+        variants.append(("aiofiles", True))
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, "demo.bin")
+        with open(path, "wb") as f:
+            f.write(os.urandom(4096))
+        
+        loop = asyncio.get_running_loop()
+        print(f"\nReading a 4KB file {num_tasks} times concurrently:")
+        for label, use_aiofiles in variants:
+            start = time.perf_counter_ns()
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(num_tasks):
+                    tg.create_task(async_disk_task(path, loop, use_aiofiles))
+            disk_time = (time.perf_counter_ns() - start) / 1e9
+            print(f"  {label:<16} {disk_time:.3f} seconds")
+    
+    print(f"\n💡 Notice: asyncio has NO truly async file I/O!")
+    print(f"   Reason: Readiness APIs (epoll/kqueue) don't work for regular files,")
+    print(f"           so blocking reads are handed to threads instead")
+    print(f"   aiofiles: a friendlier API over the same thread-pool approach")
+    # io_uring (Linux 5.1+) is a real async file I/O interface. libuv (>= 1.45)
+    # uses it for its own fs operations, but neither asyncio nor uvloop exposes
+    # file I/O to Python, so reads from Python still go through threads.
+    print(f"   io_uring (Linux) does real async file I/O, but asyncio doesn't use it")
+    if aiofiles is None:
+        print(f"   (Install aiofiles to compare: pip install aiofiles)")
+
+
 # ============================================================================
 # SUMMARY
 # ============================================================================
@@ -198,13 +402,24 @@ Remember: Python is NOT single-threaded, it's GIL-limited!
 # MAIN
 # ============================================================================
 
+def run_async(coro):
+    """Run a coroutine on uvloop if available, otherwise on the default asyncio loop"""
+    if uvloop is None:
+        return asyncio.run(coro)
+    if hasattr(uvloop, "run"):  # uvloop >= 0.18
+        return uvloop.run(coro)  # Faster libuv-based event loop
+    uvloop.install()  # Older uvloop: install its event loop policy instead
+    return asyncio.run(coro)
+
+
 def main():
     print("\n🐍 Python Async, Threading, and GIL Demo 🐍")
     
     demo_cpu_bound_with_gil()
     demo_io_bound_with_threading()
-    asyncio.run(demo_async_io())
+    run_async(demo_async_io())
     demonstrate_threads_are_real()
+    run_async(demo_async_disk_io())
     print_summary()
 
 
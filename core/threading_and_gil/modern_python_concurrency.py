@@ -17,10 +17,26 @@ Python 3.13 (Oct 2024):
 This script detects your Python version and demonstrates available features.
 """
 
+import os
 import sys
+import math
 import time
+import importlib
 import threading
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Optional: NumPy (vectorized variant of cpu_intensive)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Optional: Numba (JIT-compiles numeric loops to native code that runs without the GIL)
+try:
+    from numba import njit
+except ImportError:
+    njit = None
 
 # Version detection
 PY_VERSION = sys.version_info
@@ -30,6 +46,19 @@ PY_313_PLUS = PY_VERSION >= (3, 13)
 # Check for free-threading (Python 3.13+)
 FREE_THREADING = hasattr(sys, '_is_gil_enabled') and not sys._is_gil_enabled()
 
+# CPUs this process may run on (respects taskset/container limits where supported)
+if hasattr(os, 'sched_getaffinity'):
+    CPU_COUNT = len(os.sched_getaffinity(0))
+else:
+    CPU_COUNT = os.cpu_count() or 4
+
+# Benchmark width: one worker per CPU, at least 2 (so there is something to
+# run in parallel) and at most 16 (to keep the output readable)
+NUM_WORKERS = max(2, min(CPU_COUNT, 16))
+
+# Speedup that counts as true parallelism, allowing for overhead (2.5x with 4 workers)
+PARALLEL_SPEEDUP = 1 + (NUM_WORKERS - 1) / 2
+
 
 # ============================================================================
 # VERSION INFO
@@ -48,6 +77,7 @@ def print_version_info():
         print("✗ Traditional GIL mode (default)")
         print("  → Only one thread executes Python code at a time")
     
+    print(f"\nCPUs available: {CPU_COUNT} (benchmarks use {NUM_WORKERS} workers)")
     print(f"\nCapabilities:")
     print(f"  • Per-interpreter GIL (PEP 684):  {'✓ Available' if PY_312_PLUS else '✗ Requires 3.12+'}")
     print(f"  • Free-threading (PEP 703):       {'✓ Available' if PY_313_PLUS else '✗ Requires 3.13+'}")
@@ -63,48 +93,141 @@ def print_version_info():
 # CPU-Bound Benchmark - Shows GIL impact
 # ============================================================================
 
-def cpu_intensive(n):
-    """CPU-intensive calculation"""
+# Cached np.arange arrays, keyed by size. Trade-off: 8 bytes per element
+# (80MB for 10M iterations) kept alive, but built once and shared by every
+# benchmark run and thread instead of re-allocated per call.
+_ARR_CACHE = {}
+
+
+def _get_arr(n):
+    """Return a cached, read-only np.arange(n) of int64"""
+    arr = _ARR_CACHE.get(n)
+    if arr is None:
+        arr = np.arange(n, dtype=np.int64)
+        arr.flags.writeable = False
+        _ARR_CACHE[n] = arr
+    return arr
+
+
+# int64 limits for the vectorized variants: exact for n <= _NUMPY_MAX_N
+_INT64_MAX = 2**63 - 1
+_NUMPY_MAX_N = math.isqrt(_INT64_MAX) + 1
+
+
+def _int64_chunk_size(n):
+    """Largest chunk of squares from range(n) whose sum fits in int64"""
+    return max(1, min(n, _INT64_MAX // max(1, (n - 1) ** 2)))
+
+
+def _sum_of_squares_numpy(n):
+    """Vectorized sum of squares"""
+    if n <= 0:
+        return 0
+    values = _get_arr(n)
+    squares = values * values
+    partial_sums = np.add.reduceat(squares, np.arange(0, n, _int64_chunk_size(n)))
+    return sum(partial_sums.tolist())
+
+
+if njit is not None:
+    # nogil=True: the compiled loop releases the GIL, so plain threads run it in parallel.
+    # (No parallel=True here - the benchmark's threads provide the parallelism.)
+    @njit(nogil=True)
+    def _sum_of_squares_numba(values, chunk):
+        """Native sum of squares, returned as int64 partial sums of `chunk` squares each"""
+        # Values come from an array - otherwise LLVM replaces the loop with a closed-form formula
+        n = len(values)
+        num_chunks = (n + chunk - 1) // chunk
+        partial_sums = np.zeros(num_chunks, dtype=np.int64)
+        for c in range(num_chunks):
+            total = 0
+            for i in range(c * chunk, min(n, (c + 1) * chunk)):
+                total += values[i] * values[i]
+            partial_sums[c] = total
+        return partial_sums
+
+
+def cpu_intensive(n, use_numpy=False, use_numba=False):
+    """CPU-intensive calculation
+    
+    The pure-Python loop is the bytecode-bound reference for the GIL benchmark.
+    With use_numpy=True the work runs in NumPy's C code instead; with
+    use_numba=True it runs as JIT-compiled native code that releases the GIL.
+    Both are exact up to n = _NUMPY_MAX_N; beyond that the Python loop is used.
+    """
+    if use_numba and njit is not None and n <= _NUMPY_MAX_N:
+        return sum(_sum_of_squares_numba(_get_arr(n), _int64_chunk_size(n)).tolist())
+    if use_numpy and np is not None and n <= _NUMPY_MAX_N:
+        return _sum_of_squares_numpy(n)
     result = 0
     for i in range(n):
-        result += i ** 2
+        result += i * i
     return result
 
 
-def benchmark_cpu_bound():
-    """Benchmark CPU-bound tasks to show GIL impact"""
+def benchmark_cpu_bound(use_numba=False):
+    """Benchmark CPU-bound tasks to show GIL impact
+    
+    With use_numba=True the task is JIT-compiled and releases the GIL,
+    so threads run in parallel even on a traditional GIL build.
+    Returns the multi-threaded time.
+    """
     print("\n" + "="*70)
-    print("BENCHMARK: CPU-Bound Task")
+    print(f"BENCHMARK: CPU-Bound Task{' (Numba, GIL released)' if use_numba else ''}")
     print("="*70)
     
     iterations = 10_000_000
-    num_workers = 4
+    num_workers = NUM_WORKERS
+    task = partial(cpu_intensive, use_numba=use_numba)
+    
+    if use_numba:
+        task(iterations)  # Warm-up: keep JIT compilation out of the timings
     
     # Sequential execution
     print(f"\n1️⃣  Sequential execution ({num_workers} tasks):")
-    start = time.perf_counter()
+    start = time.perf_counter_ns()
     for _ in range(num_workers):
-        cpu_intensive(iterations)
-    seq_time = time.perf_counter() - start
-    print(f"   Time: {seq_time:.3f}s")
+        task(iterations)
+    seq_time = (time.perf_counter_ns() - start) / 1e9
+    print(f"   Time: {seq_time:.3f}s ({seq_time / num_workers:.3f}s per task)")
     
     # Multi-threaded execution
     print(f"\n2️⃣  Multi-threaded execution ({num_workers} threads):")
-    start = time.perf_counter()
+    start = time.perf_counter_ns()
     with ThreadPoolExecutor(max_workers=num_workers) as executor:
-        futures = [executor.submit(cpu_intensive, iterations) for _ in range(num_workers)]
-        for f in futures:
-            f.result()
-    mt_time = time.perf_counter() - start
+        list(executor.map(task, [iterations] * num_workers))
+    mt_time = (time.perf_counter_ns() - start) / 1e9
     print(f"   Time: {mt_time:.3f}s")
     
+    # Multi-process execution: separate processes, separate GILs - the upper
+    # bound threads can reach for this workload (skipped for Numba, where each
+    # process would pay for JIT compilation again)
+    proc_time = None
+    if not use_numba:
+        print(f"\n3️⃣  Multi-process execution ({num_workers} processes):")
+        start = time.perf_counter_ns()
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(task, [iterations] * num_workers))
+        proc_time = (time.perf_counter_ns() - start) / 1e9
+        print(f"   Time: {proc_time:.3f}s")
+    
     # Analysis
     speedup = seq_time / mt_time
     print(f"\n📊 Results:")
-    print(f"   Speedup: {speedup:.2f}x")
+    print(f"   Speedup: {speedup:.2f}x (ideal with {num_workers} cores: {num_workers}x)")
+    if proc_time is not None:
+        print(f"   Multi-process speedup: {seq_time / proc_time:.2f}x")
+        # 100% = threads as fast as processes (what free-threading aims for)
+        print(f"   Threading efficiency vs processes: {proc_time / mt_time:.0%}")
     
-    if FREE_THREADING:
-        if speedup > 2.5:
+    if use_numba:
+        if speedup > PARALLEL_SPEEDUP:
+            print(f"   ✓ TRUE PARALLELISM! Compiled code runs without the GIL")
+            print(f"   ✓ Multiple threads execute simultaneously")
+        else:
+            print(f"   ⚠️  Expected better speedup (how many CPU cores do you have?)")
+    elif FREE_THREADING:
+        if speedup > PARALLEL_SPEEDUP:
             print(f"   ✓ TRUE PARALLELISM! Free-threading working!")
             print(f"   ✓ Multiple threads execute simultaneously")
         else:
@@ -115,12 +238,83 @@ def benchmark_cpu_bound():
             print(f"   → Multiple threads take same time as sequential")
         else:
             print(f"   → Some speedup (context switching overhead varies)")
+    
+    # Vectorized reference (same work, no Python bytecode in the hot loop)
+    if np is not None and not use_numba:
+        start = time.perf_counter_ns()
+        for _ in range(num_workers):
+            cpu_intensive(iterations, use_numpy=True)
+        numpy_time = (time.perf_counter_ns() - start) / 1e9
+        print(f"\n   NumPy sequential: {numpy_time:.3f}s ({seq_time / numpy_time:.0f}x faster than pure Python)")
+    
+    return mt_time
 
 
 # ============================================================================
 # Python 3.12+: Subinterpreters (PEP 684)
 # ============================================================================
 
+# Code run inside subinterpreters. Compiled once here so repeated runs skip the
+# parser/compiler (3.13+ accept code objects; 3.12's run_string needs the source).
+_SUBINTERP_DEMO_SOURCE = """
+import threading
+print(f"   Thread ID: {threading.get_ident()}")
+print(f"   I'm running in a separate interpreter!")
+result = sum(i**2 for i in range(1000))
+print(f"   Calculation result: {result}")
+"""
+_SUBINTERP_DEMO_CODE = compile(_SUBINTERP_DEMO_SOURCE, "<subinterpreter>", "exec")
+
+# Same work as cpu_intensive(); `iterations` is injected into the interpreter's __main__
+_SUBINTERP_CPU_SOURCE = """
+def cpu_intensive(n):
+    result = 0
+    for i in range(n):
+        result += i * i
+    return result
+
+result = cpu_intensive(iterations)
+"""
+_SUBINTERP_CPU_CODE = compile(_SUBINTERP_CPU_SOURCE, "<subinterpreter>", "exec")
+
+
+def _get_interpreters_module():
+    """Return (module, is_stdlib_api) for the available subinterpreter API"""
+    try:
+        from concurrent import interpreters  # Python 3.14+ (PEP 734)
+        return interpreters, True
+    except ImportError:
+        pass
+    for name in ("_interpreters", "_xxsubinterpreters"):  # Python 3.13 / 3.12
+        try:
+            return importlib.import_module(name), False
+        except ImportError:
+            pass
+    return None, False
+
+
+def _exec_in_interpreter(interpreters, is_stdlib_api, interp, code, source, shared=None):
+    """Run code in a subinterpreter, using the precompiled code object where supported"""
+    if is_stdlib_api:
+        if shared:
+            interp.prepare_main(**shared)
+        interp.exec(code)
+    elif hasattr(interpreters, "exec"):  # Python 3.13: returns failure info instead of raising
+        excinfo = interpreters.exec(interp, code, shared)
+        if excinfo is not None:
+            raise RuntimeError(f"Subinterpreter failed:\n{excinfo.formatted}")
+    else:  # Python 3.12: run_string() only accepts source text
+        interpreters.run_string(interp, source, shared)
+
+
+def _close_interpreter(interpreters, is_stdlib_api, interp):
+    """Destroy a subinterpreter created by interpreters.create()"""
+    if is_stdlib_api:
+        interp.close()
+    else:
+        interpreters.destroy(interp)
+
+
 def demo_subinterpreters():
     """Demonstrate subinterpreters with per-interpreter GIL"""
     print("\n" + "="*70)
@@ -131,42 +325,79 @@ def demo_subinterpreters():
         print(f"\n⚠️  Requires Python 3.12+ (you have {PY_VERSION.major}.{PY_VERSION.minor})")
         return
     
-    try:
-        import _xxsubinterpreters as interpreters
-        
-        print("\n✓ Subinterpreters available!")
-        print("\n📝 Key concepts:")
-        print("   • Each subinterpreter = separate Python environment")
-        print("   • Each has its OWN GIL (independent locking)")
-        print("   • True parallel CPU execution across interpreters")
-        print("   • Isolated namespaces (no shared state)")
-        
-        # Create and use subinterpreter
-        print(f"\n🔧 Creating subinterpreter...")
-        interp_id = interpreters.create()
-        print(f"   Created with ID: {interp_id}")
-        
-        # Execute code in subinterpreter
-        print(f"\n▶️  Executing code in subinterpreter:")
-        code = """
-import threading
-print(f"   Thread ID: {threading.get_ident()}")
-print(f"   I'm running in a separate interpreter!")
-result = sum(i**2 for i in range(1000))
-print(f"   Calculation result: {result}")
-"""
-        interpreters.run_string(interp_id, code)
-        
-        # Cleanup
-        interpreters.destroy(interp_id)
-        print(f"   ✓ Subinterpreter destroyed")
-        
-        print(f"\n💡 Use case:")
-        print(f"   When you need true parallelism without multiprocessing overhead")
-        
-    except ImportError:
-        print(f"\n⚠️  _xxsubinterpreters not available")
+    interpreters, is_stdlib_api = _get_interpreters_module()
+    if interpreters is None:
+        print(f"\n⚠️  Subinterpreter API not available")
         print(f"   (Still experimental - use with caution)")
+        return
+    
+    print("\n✓ Subinterpreters available!")
+    print("\n📝 Key concepts:")
+    print("   • Each subinterpreter = separate Python environment")
+    print("   • Each has its OWN GIL (independent locking)")
+    print("   • True parallel CPU execution across interpreters")
+    print("   • Isolated namespaces (no shared state)")
+    
+    # Create and use subinterpreter
+    print(f"\n🔧 Creating subinterpreter...")
+    interp = interpreters.create()
+    print(f"   Created with ID: {interp.id if is_stdlib_api else interp}")
+    
+    # Execute code in subinterpreter
+    print(f"\n▶️  Executing code in subinterpreter:")
+    _exec_in_interpreter(interpreters, is_stdlib_api, interp, _SUBINTERP_DEMO_CODE, _SUBINTERP_DEMO_SOURCE)
+    
+    # Cleanup
+    _close_interpreter(interpreters, is_stdlib_api, interp)
+    print(f"   ✓ Subinterpreter destroyed")
+    
+    print(f"\n💡 Use case:")
+    print(f"   When you need true parallelism without multiprocessing overhead")
+
+
+def benchmark_subinterpreters(mt_time=None):
+    """Run the CPU benchmark in parallel subinterpreters (one per thread, each with its own GIL)"""
+    print("\n" + "="*70)
+    print("BENCHMARK: CPU-Bound Task in Subinterpreters")
+    print("="*70)
+    
+    if not PY_312_PLUS:
+        print(f"\n⚠️  Requires Python 3.12+ (you have {PY_VERSION.major}.{PY_VERSION.minor})")
+        return
+    
+    interpreters, is_stdlib_api = _get_interpreters_module()
+    if interpreters is None:
+        print(f"\n⚠️  Subinterpreter API not available")
+        return
+    
+    iterations = 10_000_000
+    num_workers = NUM_WORKERS
+    
+    def run(interp):
+        _exec_in_interpreter(interpreters, is_stdlib_api, interp,
+                             _SUBINTERP_CPU_CODE, _SUBINTERP_CPU_SOURCE, {"iterations": iterations})
+    
+    print(f"\n🔀 {num_workers} subinterpreters driven by {num_workers} threads:")
+    interps = [interpreters.create() for _ in range(num_workers)]
+    try:
+        start = time.perf_counter_ns()
+        # map() re-raises a failure from any worker instead of reporting a bogus time
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            list(executor.map(run, interps))
+        interp_time = (time.perf_counter_ns() - start) / 1e9
+    finally:
+        for interp in interps:
+            _close_interpreter(interpreters, is_stdlib_api, interp)
+    print(f"   Time: {interp_time:.3f}s")
+    
+    if mt_time is not None:
+        print(f"\n📊 Results:")
+        speedup = mt_time / interp_time
+        print(f"   Speedup vs multi-threaded (shared GIL): {speedup:.2f}x")
+        if speedup > PARALLEL_SPEEDUP:
+            print(f"   ✓ TRUE PARALLELISM! Each interpreter has its own GIL")
+        else:
+            print(f"   ⚠️  Expected better speedup (how many CPU cores do you have?)")
 
 
 # ============================================================================
@@ -296,8 +527,11 @@ def main():
     print("\n🚀 Modern Python Concurrency: 3.12 & 3.13 🚀")
     
     print_version_info()
-    benchmark_cpu_bound()
+    mt_time = benchmark_cpu_bound()
+    if njit is not None:
+        benchmark_cpu_bound(use_numba=True)
     demo_subinterpreters()
+    benchmark_subinterpreters(mt_time)
     demo_free_threading_info()
     show_comparison_guide()
     